@@ -49,6 +49,15 @@ except ImportError:
     from urlparse import urlparse  # type: ignore
 
 
+# json.dumps() creates a new encoder every time it's called with custom
+# options, these are used on every encrypted message so create them only once.
+_json_encoder = json.JSONEncoder(separators=(",", ":"))
+_canonical_json_encoder = json.JSONEncoder(
+    ensure_ascii=False,
+    separators=(",", ":"),
+    sort_keys=True,
+)
+
 MATRIX_API_PATH = "/_matrix/client/r0"  # type: str
 MATRIX_MEDIA_API_PATH = "/_matrix/media/r0"  # type: str
 
@@ -138,18 +147,13 @@ class Api:
     def to_json(content_dict):
         # type: (Dict[Any, Any]) -> str
         """Turn a dictionary into a json string."""
-        return json.dumps(content_dict, separators=(",", ":"))
+        return _json_encoder.encode(content_dict)
 
     @staticmethod
     def to_canonical_json(content_dict):
         # type: (Dict[Any, Any]) -> str
         """Turn a dictionary into a canonical json string."""
-        return json.dumps(
-            content_dict,
-            ensure_ascii=False,
-            separators=(",", ":"),
-            sort_keys=True,
-        )
+        return _canonical_json_encoder.encode(content_dict)
 
     @staticmethod
     def mimetype_to_msgtype(mimetype):
@@ -1972,11 +1972,13 @@ class AsyncClient(Client):
         import_keys = partial(self.olm.import_keys_static, infile, passphrase)
         sessions = await loop.run_in_executor(None, import_keys)
 
-        for session in sessions:
-            # This could be improved by writing everything to db at once at
-            # the end
-            if self.olm.inbound_group_store.add(session):
-                self.store.save_inbound_group_session(session)
+        new_sessions = [
+            session for session in sessions
+            if self.olm.inbound_group_store.add(session)
+        ]
+
+        if new_sessions:
+            self.store.save_inbound_group_sessions(new_sessions)
 
     @logged_in
     async def room_create(
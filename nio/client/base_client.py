@@ -490,6 +490,37 @@ class Client:
 
         return changed
 
+    @store_loaded
+    def verify_devices(self, devices: List[OlmDevice]) -> bool:
+        """Mark a list of devices as verified.
+
+        This is a more efficient way to mark multiple devices as verified
+        than calling verify_device() for every single one of them.
+
+        Args:
+            devices (List[OlmDevice]): The devices which should be added to
+                the trust list.
+
+        Returns true if any of the devices was verified, false if all of
+        them were already verified.
+        """
+        assert self.olm
+
+        changed = [device for device in devices if not device.verified]
+
+        if not changed:
+            return False
+
+        self.olm.verify_devices(changed)
+
+        users = {device.user_id for device in changed}
+
+        for room in self.rooms.values():
+            if not users.isdisjoint(room.users):
+                self.invalidate_outbound_session(room.room_id)
+
+        return True
+
     @store_loaded
     def unverify_device(self, device: OlmDevice) -> bool:
         """Unmark a device as verified.
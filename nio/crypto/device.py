@@ -201,7 +201,7 @@ class DeviceStore:
         Returns True if the device was added to the store, False if it already
         was in the store.
         """
-        if device in self:
+        if self._entries[device.user_id].get(device.id) == device:
             return False
 
         self._entries[device.user_id][device.id] = device
@@ -31,6 +31,30 @@ class SessionStore:
         self._entries[sender_key].sort(key=lambda x: x.use_time, reverse=True)
         return True
 
+    def add_many(self, sender_key: str, sessions: List[Session]) -> None:
+        """Add multiple sessions that belong to the same sender key.
+
+        The sessions are sorted only once after all of them were added.
+        """
+        session_list = self._entries[sender_key]
+        known = {id(s) for s in session_list}
+
+        session_list.extend(s for s in sessions if id(s) not in known)
+        session_list.sort(key=lambda x: x.use_time, reverse=True)
+
+    def mark_as_used(self, sender_key: str, session: Session) -> None:
+        """Move a session that was just used to the front of the list.
+
+        Sessions are sorted by their use time, the most recently used session
+        comes first. Messages from a device usually keep arriving over the same
+        session, so it will be the first one that gets tried next time.
+        """
+        sessions = self._entries[sender_key]
+
+        if sessions and sessions[0] is not session:
+            sessions.remove(session)
+            sessions.insert(0, session)
+
     def __iter__(self) -> Iterator[Session]:
         for session_list in self._entries.values():
             for session in session_list:
@@ -65,7 +89,9 @@ class GroupSessionStore:
     def add(self, session: InboundGroupSession) -> bool:
         room_id = session.room_id
         sender_key = session.sender_key
-        if session in self._entries[room_id][sender_key].values():
+        # Sessions are keyed by their id, so only the slot of this session
+        # needs to be checked instead of scanning every session of the sender.
+        if self._entries[room_id][sender_key].get(session.id) is session:
             return False
 
         self._entries[room_id][sender_key][session.id] = session
@@ -342,13 +342,22 @@ class Olm:
 
         return content
 
-    def _olm_encrypt(self, session, recipient_device, message_type, content):
+    def _olm_encrypt(
+        self,
+        session,
+        recipient_device,
+        message_type,
+        content,
+        save=True
+    ):
+        identity_keys = self.account.identity_keys
+
         payload = {
             "sender": self.user_id,
             "sender_device": self.device_id,
 
             "keys": {
-                "ed25519": self.account.identity_keys["ed25519"]
+                "ed25519": identity_keys["ed25519"]
             },
 
             "recipient": recipient_device.user_id,
@@ -361,11 +370,13 @@ class Olm:
         }
 
         olm_message = session.encrypt(Api.to_json(payload))
-        self.store.save_session(recipient_device.curve25519, session)
+
+        if save:
+            self.save_session(recipient_device.curve25519, session)
 
         return {
             "algorithm": self._olm_algorithm,
-            "sender_key": self.account.identity_keys["curve25519"],
+            "sender_key": identity_keys["curve25519"],
             "ciphertext": {
                 recipient_device.curve25519: {
                     "type": olm_message.message_type,
@@ -1038,6 +1049,10 @@ class Olm:
         # type: (OlmDevice) -> bool
         return self.store.verify_device(device)
 
+    def verify_devices(self, devices):
+        # type: (List[OlmDevice]) -> None
+        self.store.verify_devices(devices)
+
     def is_device_verified(self, device):
         # type: (OlmDevice) -> bool
         return self.store.is_device_verified(device)
@@ -1154,7 +1169,7 @@ class Olm:
             wedged[device.user_id].append(device.device_id)
 
         for device in self.key_request_devices_no_session:
-            if device in wedged[device.user_id]:
+            if device.device_id in wedged[device.user_id]:
                 continue
 
             wedged[device.user_id].append(device.device_id)
@@ -1223,6 +1238,7 @@ class Olm:
                 )
 
                 plaintext = session.decrypt(message)
+                self.session_store.mark_as_used(sender_key, session)
                 self.save_session(sender_key, session)
 
                 logger.info(
@@ -1867,17 +1883,23 @@ class Olm:
             to_device_dict = {"messages": {}}  # type: Dict[str, Any]
             sharing_with = set()
 
+            used_sessions = []
+
             for user_id, device, session in user_map_chunk:
 
                 olm_dict = self._olm_encrypt(session, device, "m.room_key",
-                                             key_content)
+                                             key_content, save=False)
                 sharing_with.add((user_id, device.id))
+                used_sessions.append((device.curve25519, session))
 
                 if user_id not in to_device_dict["messages"]:
                     to_device_dict["messages"][user_id] = {}
 
                 to_device_dict["messages"][user_id][device.id] = olm_dict
 
+            if used_sessions:
+                self.save_sessions(used_sessions)
+
             yield (sharing_with, to_device_dict)
 
     def share_group_session(
@@ -1966,16 +1988,24 @@ class Olm:
         if mark_as_ignored:
             self.store.ignore_devices(mark_as_ignored)
 
+        used_sessions = []
+
         for user_id, device, session in user_map:
             olm_dict = self._olm_encrypt(session, device, "m.room_key",
-                                         key_content)
+                                         key_content, save=False)
             sharing_with.add((user_id, device.id))
+            used_sessions.append((device.curve25519, session))
 
             if user_id not in to_device_dict["messages"]:
                 to_device_dict["messages"][user_id] = {}
 
             to_device_dict["messages"][user_id][device.id] = olm_dict
 
+        # Save all the used Olm sessions at once, this avoids a database
+        # transaction per device.
+        if used_sessions:
+            self.save_sessions(used_sessions)
+
         return sharing_with, to_device_dict
 
     def load(self):
@@ -1989,10 +2019,18 @@ class Olm:
         # type: (str, Session) -> None
         self.store.save_session(curve_key, session)
 
+    def save_sessions(self, sessions):
+        # type: (List[Tuple[str, Session]]) -> None
+        self.store.save_sessions(sessions)
+
     def save_inbound_group_session(self, session):
         # type: (InboundGroupSession) -> None
         self.store.save_inbound_group_session(session)
 
+    def save_inbound_group_sessions(self, sessions):
+        # type: (List[InboundGroupSession]) -> None
+        self.store.save_inbound_group_sessions(sessions)
+
     def save_account(self, account=None):
         # type: (Optional[OlmAccount]) -> None
         if account:
@@ -2174,11 +2212,13 @@ class Olm:
         """
         sessions = Olm.import_keys_static(infile, passphrase)
 
-        for session in sessions:
-            # This could be improved by writing everything to db at once at
-            # the end
-            if self.inbound_group_store.add(session):
-                self.save_inbound_group_session(session)
+        new_sessions = [
+            session for session in sessions
+            if self.inbound_group_store.add(session)
+        ]
+
+        if new_sessions:
+            self.save_inbound_group_sessions(new_sessions)
 
         logger.info(
             "Successfully imported encryption keys from {}".format(infile)
@@ -17,7 +17,7 @@
 
 from builtins import super
 from datetime import datetime, timedelta
-from typing import List, Optional, Set, Tuple
+from typing import Dict, List, Optional, Set, Tuple
 
 from dataclasses import dataclass, field
 import olm
@@ -32,7 +32,9 @@ class OlmAccount(olm.Account):
         super().__init__()
 
     def __new__(cls, *args):
-        return super().__new__(cls)
+        obj = super().__new__(cls)
+        obj._identity_keys = None
+        return obj
 
     @classmethod
     def from_pickle(
@@ -46,6 +48,19 @@ class OlmAccount(olm.Account):
         account.shared = shared
         return account
 
+    @property
+    def identity_keys(self):
+        # type: () -> Dict[str, str]
+        """dict: Public part of the identity keys of the account.
+
+        The identity keys of an account never change, they are fetched from
+        libolm only once.
+        """
+        if self._identity_keys is None:
+            self._identity_keys = super().identity_keys
+
+        return dict(self._identity_keys)
+
 
 class _SessionExpirationMixin:
     @property
@@ -15,10 +15,12 @@ import os
 import sqlite3
 from builtins import super
 from functools import wraps
-from typing import Optional, List, Dict
+from itertools import groupby
+from operator import attrgetter
+from typing import Optional, List, Dict, Tuple
 
 from dataclasses import dataclass, field
-from peewee import DoesNotExist, SqliteDatabase
+from peewee import DoesNotExist, SqliteDatabase, prefetch
 from playhouse.sqliteq import SqliteQueueDatabase
 
 from . import (Accounts, DeviceKeys, DeviceKeys_v1, DeviceTrustState,
@@ -84,13 +86,25 @@ class MatrixStore:
     database_name: str = ""
     database_path: str = field(init=False)
     database: SqliteDatabase = field(init=False)
+    _saved_account: Optional[Tuple[bytes, bool]] = field(
+        init=False,
+        default=None,
+        repr=False
+    )
 
     def _create_database(self):
+        # The write-ahead log avoids syncing a rollback journal on every
+        # commit, with synchronous set to normal a commit may only be lost on
+        # a power loss or OS crash, never due to the process crashing.
         return SqliteDatabase(
             self.database_path,
             pragmas={
                 "foreign_keys": 1,
                 "secure_delete": 1,
+                "journal_mode": "wal",
+                "synchronous": "normal",
+                "temp_store": "memory",
+                "cache_size": -8000,
             }
         )
 
@@ -163,13 +177,14 @@ class MatrixStore:
         if not account:
             return None
 
+        self._saved_account = (account.account, account.shared)
+
         return OlmAccount.from_pickle(
             account.account,
             self.pickle_key,
             account.shared
         )
 
-    @use_database
     def save_account(self, account):
         """Save the provided Olm account to the database.
 
@@ -177,22 +192,47 @@ class MatrixStore:
             account (OlmAccount): The olm account that will be pickled and
                 saved in the database.
         """
-        Accounts.insert(
+        pickle = account.pickle(self.pickle_key)
+
+        # The account is often saved after operations that didn't modify it,
+        # pickles are deterministic so we can skip the write in that case.
+        if self._saved_account == (pickle, account.shared):
+            return
+
+        self._save_account(pickle, account.shared)
+
+        # Only remember the saved state once the transaction was committed,
+        # a failed save needs to be retried.
+        self._saved_account = (pickle, account.shared)
+
+    @use_database_atomic
+    def _save_account(self, pickle, shared):
+        # type: (bytes, bool) -> None
+        insert = Accounts.insert(
             user_id=self.user_id,
             device_id=self.device_id,
-            shared=account.shared,
-            account=account.pickle(self.pickle_key)
-        ).on_conflict_ignore().execute()
+            shared=shared,
+            account=pickle
+        )
 
-        Accounts.update(
-            {
-                Accounts.account: account.pickle(self.pickle_key),
-                Accounts.shared: account.shared
-            }
-        ).where(
-            (Accounts.user_id == self.user_id)
-            & (Accounts.device_id == self.device_id)
-        ).execute()
+        # Upserts are only supported since Sqlite 3.24.0.
+        if sqlite3.sqlite_version_info >= (3, 24, 0):
+            insert.on_conflict(
+                conflict_target=[Accounts.user_id, Accounts.device_id],
+                preserve=[Accounts.account, Accounts.shared]
+            ).execute()
+        else:
+            insert.on_conflict_ignore().execute()
+
+            Accounts.update(
+                {
+                    Accounts.account: pickle,
+                    Accounts.shared: shared
+                }
+            ).where(
+                (Accounts.user_id == self.user_id)
+                & (Accounts.device_id == self.device_id)
+            ).execute()
 
     @use_database
     def load_sessions(self):
@@ -210,17 +250,23 @@ class MatrixStore:
         if not account:
             return session_store
 
-        for s in account.olm_sessions:
-            session = Session.from_pickle(
-                s.session,
-                s.creation_time,
-                self.pickle_key
-            )
-            session_store.add(s.sender_key, session)
+        # Group the sessions by their sender key so every list of sessions
+        # gets built and sorted only once.
+        query = account.olm_sessions.order_by(OlmSessions.sender_key)
+
+        for sender_key, rows in groupby(query, key=attrgetter("sender_key")):
+            sessions = [
+                Session.from_pickle(
+                    s.session,
+                    s.creation_time,
+                    self.pickle_key
+                )
+                for s in rows
+            ]
+            session_store.add_many(sender_key, sessions)
 
         return session_store
 
-    @use_database
     def save_session(self, sender_key, session):
         """Save the provided Olm session to the database.
 
@@ -229,17 +275,43 @@ class MatrixStore:
             session (Session): The Olm session that will be pickled and
                 saved in the database.
         """
+        self.save_sessions([(sender_key, session)])
+
+    @use_database_atomic
+    def save_sessions(self, sessions):
+        """Save multiple Olm sessions to the database in a single transaction.
+
+        This is a more efficient way to save multiple sessions, e.g. after a
+        group session was shared with many devices.
+
+        Args:
+            sessions (Iterable[Tuple[str, Session]]): An iterable of tuples
+                containing the curve key that owns the Olm session and the
+                Olm session that will be pickled and saved in the database.
+        """
         account = self._get_account()
         assert account
 
-        OlmSessions.replace(
-            account=account,
-            sender_key=sender_key,
-            session=session.pickle(self.pickle_key),
-            session_id=session.id,
-            creation_time=session.creation_time,
-            last_usage_date=session.use_time
-        ).execute()
+        # A session might be passed in multiple times, only pickle it once.
+        unique_sessions = {
+            session.id: (sender_key, session)
+            for sender_key, session in sessions
+        }
+
+        rows = [
+            {
+                "account": account,
+                "sender_key": sender_key,
+                "session": session.pickle(self.pickle_key),
+                "session_id": session.id,
+                "creation_time": session.creation_time,
+                "last_usage_date": session.use_time,
+            } for sender_key, session in unique_sessions.values()
+        ]
+
+        for idx in range(0, len(rows), 100):
+            data = rows[idx:idx + 100]
+            OlmSessions.replace_many(data).execute()
 
     @use_database
     def load_inbound_group_sessions(self):
@@ -257,7 +329,11 @@ class MatrixStore:
         if not account:
             return store
 
-        for s in account.inbound_group_sessions:
+        # Prefetch the forwarding chains, otherwise every session would need
+        # a separate query to fetch its chain.
+        sessions = prefetch(account.inbound_group_sessions, ForwardedChains)
+
+        for s in sessions:
             session = InboundGroupSession.from_pickle(
                 s.session,
                 s.fp_key,
@@ -270,40 +346,51 @@ class MatrixStore:
 
         return store
 
-    @use_database
     def save_inbound_group_session(self, session):
         """Save the provided Megolm inbound group session to the database.
 
         Args:
             session (InboundGroupSession): The session to save.
         """
+        self.save_inbound_group_sessions([session])
+
+    @use_database_atomic
+    def save_inbound_group_sessions(self, sessions):
+        """Save multiple Megolm inbound group sessions in a single transaction.
+
+        Args:
+            sessions (Iterable[InboundGroupSession]): The sessions to save.
+        """
         account = self._get_account()
         assert account
 
+        for session in sessions:
+            self._save_inbound_group_session(account, session)
+
+    def _save_inbound_group_session(self, account, session):
+        pickle = session.pickle(self.pickle_key)
+
         MegolmInboundSessions.insert(
             sender_key=session.sender_key,
             account=account,
             fp_key=session.ed25519,
             room_id=session.room_id,
-            session=session.pickle(self.pickle_key),
+            session=pickle,
             session_id=session.id
         ).on_conflict_ignore().execute()
 
         MegolmInboundSessions.update(
-            {
-                MegolmInboundSessions.session: session.pickle(
-                    self.pickle_key
-                )
-            }
+            {MegolmInboundSessions.session: pickle}
         ).where(
             MegolmInboundSessions.session_id == session.id
         ).execute()
 
-        # TODO, use replace many here
-        for chain in session.forwarding_chain:
-            ForwardedChains.replace(
-                sender_key=chain,
-                session=session.id
+        if session.forwarding_chain:
+            ForwardedChains.replace_many(
+                [
+                    {"sender_key": chain, "session": session.id}
+                    for chain in session.forwarding_chain
+                ]
             ).execute()
 
     @use_database
@@ -319,7 +406,7 @@ class MatrixStore:
         if not account:
             return store
 
-        for d in account.device_keys:
+        for d in prefetch(account.device_keys, Keys):
             store.add(OlmDevice(
                 d.user_id,
                 d.device_id,
@@ -426,7 +513,7 @@ class MatrixStore:
             account=account
         ).on_conflict_ignore().execute()
 
-    @use_database
+    @use_database_atomic
     def remove_outgoing_key_request(self, key_request):
         # type: (OutgoingKeyRequest) -> None
         """Remove an active outgoing key request from the store."""
@@ -485,7 +572,7 @@ class MatrixStore:
 
         return None
 
-    @use_database
+    @use_database_atomic
     def delete_encrypted_room(self, room):
         # type: (str) -> None
         """Delete the a encrypted room from the store."""
@@ -529,6 +616,19 @@ class MatrixStore:
         """
         raise NotImplementedError
 
+    def verify_devices(self, devices):
+        # type: (List[OlmDevice]) -> None
+        """Mark a list of devices as verified.
+
+        This is a more efficient way to mark multiple devices as verified.
+
+        Args:
+            device (list[OlmDevice]): A list of OlmDevices that will be marked
+                as verified.
+
+        """
+        raise NotImplementedError
+
     def is_device_verified(self, device):
         # type: (OlmDevice) -> bool
         """Check if a device is verified.
@@ -689,6 +789,17 @@ class DefaultStore(MatrixStore):
         device.trust_state = TrustState.verified
         return self.trust_db.add(key)
 
+    def verify_devices(self, devices):
+        # type: (List[OlmDevice]) -> None
+        keys = [Key.from_olmdevice(device) for device in devices]
+
+        self.blacklist_db.remove_many(keys)
+        self.ignore_db.remove_many(keys)
+        self.trust_db.add_many(keys)
+
+        for device in devices:
+            device.trust_state = TrustState.verified
+
     def is_device_verified(self, device):
         # type: (OlmDevice) -> bool
         key = Key.from_olmdevice(device)
@@ -754,7 +865,7 @@ class DefaultStore(MatrixStore):
         if not account:
             return store
 
-        for d in account.device_keys:
+        for d in prefetch(account.device_keys, Keys):
             device = OlmDevice(
                 d.user_id,
                 d.device_id,
@@ -994,9 +1105,8 @@ class SqliteStore(MatrixStore):
 
         return device_ids
 
-    @use_database_atomic
-    def ignore_devices(self, devices):
-        # type: (List[OlmDevice]) -> None
+    def _set_devices_trust_state(self, devices, state):
+        # type: (List[OlmDevice], TrustState) -> None
         acc = self._get_account()
 
         if not acc:
@@ -1010,7 +1120,7 @@ class SqliteStore(MatrixStore):
         rows = [
             {
                 "device_id": device_id,
-                "state": TrustState.ignored
+                "state": state
             } for device_id in device_ids
         ]
 
@@ -1021,7 +1131,17 @@ class SqliteStore(MatrixStore):
             DeviceTrustState.replace_many(trust_data).execute()
 
         for device in devices:
-            device.trust_state = TrustState.ignored
+            device.trust_state = state
+
+    @use_database_atomic
+    def verify_devices(self, devices):
+        # type: (List[OlmDevice]) -> None
+        self._set_devices_trust_state(devices, TrustState.verified)
+
+    @use_database_atomic
+    def ignore_devices(self, devices):
+        # type: (List[OlmDevice]) -> None
+        self._set_devices_trust_state(devices, TrustState.ignored)
 
     @use_database
     def is_device_ignored(self, device):
@@ -1047,7 +1167,9 @@ class SqliteStore(MatrixStore):
         if not account:
             return store
 
-        for d in account.device_keys:
+        device_keys = prefetch(account.device_keys, Keys, DeviceTrustState)
+
+        for d in device_keys:
             try:
                 trust_state = d.trust_state[0].state
             except IndexError:
@@ -1,5 +1,5 @@
-from functools import wraps
-from typing import Any, Iterator, List, Optional
+import os
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 
 from atomicwrites import atomic_write
 
@@ -71,18 +71,28 @@ class Ed25519Key(Key):
 
         return False
 
+    def __hash__(self) -> int:
+        return hash((self.user_id, self.device_id, self.key))
+
 
 class KeyStore:
     def __init__(self, filename: str):
-        self._entries: List[Key] = []
+        # Keys indexed by the user id/device id tuple they belong to.
+        self._entries: Dict[Tuple[str, str], Key] = {}
         self._filename: str = filename
 
         self._load(filename)
 
     def __iter__(self) -> Iterator[Key]:
-        for entry in self._entries:
+        for entry in self._entries.values():
             yield entry
 
+    def __contains__(self, key: Any) -> bool:
+        if not isinstance(key, Key):
+            return False
+
+        return self.check(key)
+
     def __repr__(self) -> str:
         return "KeyStore object, file: {}".format(self._filename)
 
@@ -100,76 +110,115 @@ class KeyStore:
                     if not entry:
                         continue
 
-                    self._entries.append(entry)
+                    self._entries[(entry.user_id, entry.device_id)] = entry
         except FileNotFoundError:
             pass
 
     def get_key(self, user_id: str, device_id: str) -> Optional[Key]:
-        for entry in self._entries:
-            if user_id == entry.user_id and device_id == entry.device_id:
-                return entry
-
-        return None
-
-    def _save_store(f):
-        @wraps(f)
-        def decorated(self, *args, **kwargs):
-            ret = f(self, *args, **kwargs)
-            self._save()
-            return ret
-
-        return decorated
+        return self._entries.get((user_id, device_id))
 
     def _save(self):
         with atomic_write(self._filename, overwrite=True) as f:
-            for entry in self._entries:
+            for entry in self._entries.values():
                 line = entry.to_line()
                 f.write(line)
 
-    @_save_store # type: ignore
+    def _append(self, keys: List[Key]):
+        # Adding keys doesn't require us to rewrite the whole file, the new
+        # keys can be appended to it. Only create the file atomically if it
+        # doesn't exist yet.
+        if not os.path.exists(self._filename):
+            self._save()
+            return
+
+        # The file might have been edited by hand, make sure we don't glue
+        # the first new key onto an unterminated last line.
+        missing_newline = False
+
+        with open(self._filename, "rb") as f:
+            if f.seek(0, os.SEEK_END) > 0:
+                f.seek(-1, os.SEEK_END)
+                missing_newline = f.read(1) != b"\n"
+
+        with open(self._filename, "a") as f:
+            if missing_newline:
+                f.write("\n")
+
+            for key in keys:
+                f.write(key.to_line())
+
     def add_many(self, keys: List[Key]):
+        # Check the whole batch before touching the store, otherwise a
+        # mismatching key would leave the keys before it in memory without
+        # them ever being written to the file.
+        pending = {}  # type: Dict[Tuple[str, str], Key]
+
         for key in keys:
-            self._add_without_save(key)
+            index = (key.user_id, key.device_id)
+            existing_key = pending.get(index) or self.get_key(*index)
+
+            if self._is_new_key(existing_key, key):
+                pending[index] = key
+
+        added = [key for key in keys if self._add_without_save(key)]
+
+        if added:
+            self._append(added)
+
+    @staticmethod
+    def _is_new_key(existing_key: Optional[Key], key: Key) -> bool:
+        if existing_key and type(existing_key) is type(key):
+            if existing_key.key != key.key:
+                message = (
+                    "Error: adding existing device to trust store "
+                    "with mismatching fingerprint {} {}".format(
+                        key.key, existing_key.key
+                    )
+                )
+                logger.error(message)
+                raise OlmTrustError(message)
+
+            return False
+
+        return True
 
     def _add_without_save(self, key: Key) -> bool:
         existing_key = self.get_key(key.user_id, key.device_id)
 
-        if existing_key:
-            if (
-                existing_key.user_id == key.user_id
-                and existing_key.device_id == key.device_id
-                and type(existing_key) is type(key)
-            ):
-                if existing_key.key != key.key:
-                    message = (
-                        "Error: adding existing device to trust store "
-                        "with mismatching fingerprint {} {}".format(
-                            key.key, existing_key.key
-                        )
-                    )
-                    logger.error(message)
-                    raise OlmTrustError(message)
+        if not self._is_new_key(existing_key, key):
+            return False
 
-        self._entries.append(key)
+        self._entries[(key.user_id, key.device_id)] = key
         return True
 
-    @_save_store # type: ignore
     def add(self, key: Key) -> bool:
-        return self._add_without_save(key)
+        if not self._add_without_save(key):
+            return False
+
+        self._append([key])
+        return True
+
+    def _remove_without_save(self, key: Key) -> bool:
+        if not self.check(key):
+            return False
+
+        del self._entries[(key.user_id, key.device_id)]
+        return True
 
-    @_save_store # type: ignore
     def remove_many(self, keys: List[Key]):
-        for key in keys:
-            if key in self._entries:
-                self._entries.remove(key)
+        # Removals need a full rewrite of the file, skip it if none of the
+        # keys were in the store.
+        removed = [key for key in keys if self._remove_without_save(key)]
+
+        if removed:
+            self._save()
 
-    @_save_store # type: ignore
     def remove(self, key: Key) -> bool:
-        if key in self._entries:
-            self._entries.remove(key)
-            return True
+        if not self._remove_without_save(key):
+            return False
 
-        return False
+        self._save()
+        return True
 
     def check(self, key: Key) -> bool:
-        return key in self._entries
+        return self.get_key(key.user_id, key.device_id) == key
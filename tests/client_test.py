@@ -484,6 +484,9 @@ class TestClass:
         with pytest.raises(LocalProtocolError):
             client.verify_device(faker.olm_device())
 
+        with pytest.raises(LocalProtocolError):
+            client.verify_devices([faker.olm_device()])
+
         with pytest.raises(LocalProtocolError):
             client.unverify_device(faker.olm_device())
 
@@ -741,6 +744,28 @@ class TestClass:
 
         assert session.shared
 
+    def test_verifying_many_devices(self, client):
+        client.receive_response(self.login_response)
+        client.receive_response(self.sync_response)
+        client.receive_response(self.joined_members)
+        client.receive_response(self.keys_query_response)
+
+        room = client.rooms[TEST_ROOM_ID]
+        alice_device = client.device_store[ALICE_ID][ALICE_DEVICE_ID]
+
+        client.olm.share_group_session(TEST_ROOM_ID, room.users, True)
+        session = client.olm.outbound_group_sessions[TEST_ROOM_ID]
+        assert (ALICE_ID, ALICE_DEVICE_ID) in session.users_ignored
+
+        response = ShareGroupSessionResponse.from_dict({}, TEST_ROOM_ID, set())
+        client.receive_response(response)
+
+        assert client.verify_devices([alice_device])
+        assert client.olm.is_device_verified(alice_device)
+        assert TEST_ROOM_ID not in client.olm.outbound_group_sessions
+
+        assert not client.verify_devices([alice_device])
+
     def test_storing_room_encryption_state(self, client):
         client.receive_response(self.login_response)
         assert not client.encrypted_rooms
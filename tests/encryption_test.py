@@ -22,7 +22,7 @@ from nio.responses import (KeysClaimResponse, KeysQueryResponse,
 from nio.store import DefaultStore, Ed25519Key, Key, KeyStore
 from nio.event_builders import RoomKeyRequestMessage
 
-from helpers import faker
+from helpers import faker, remove_database
 
 AliceId = "@alice:example.org"
 Alice_device = "ALDEVICE"
@@ -43,7 +43,7 @@ def ephemeral(func):
         try:
             ret = func(*args, **kwargs)
         finally:
-            os.remove(os.path.join(
+            remove_database(os.path.join(
                 ephemeral_dir,
                 "ephemeral_DEVICEID.db"
             ))
@@ -202,6 +202,40 @@ class TestClass:
         else:
             assert s2 == store.get(curve_key)
 
+    def test_session_store_add_many(self):
+        alice, bob, s = self._create_session()
+        bob.generate_one_time_keys(1)
+        one_time = list(bob.one_time_keys["curve25519"].values())[0]
+        curve_key = bob.identity_keys["curve25519"]
+        s2 = OutboundSession(alice, curve_key, one_time)
+
+        store = SessionStore()
+        store.add(curve_key, s)
+        store.add_many(curve_key, [s, s2])
+
+        assert len(store[curve_key]) == 2
+        assert store.get(curve_key) is max(
+            (s, s2),
+            key=lambda session: session.use_time
+        )
+
+    def test_session_store_mark_as_used(self):
+        alice, bob, s = self._create_session()
+        bob.generate_one_time_keys(1)
+        one_time = list(bob.one_time_keys["curve25519"].values())[0]
+        curve_key = bob.identity_keys["curve25519"]
+        s2 = OutboundSession(alice, curve_key, one_time)
+
+        store = SessionStore()
+        store.add(curve_key, s)
+        store.add(curve_key, s2)
+
+        old_session = store[curve_key][1]
+        store.mark_as_used(curve_key, old_session)
+
+        assert store.get(curve_key) is old_session
+        assert len(store[curve_key]) == 2
+
     def test_device_store(self):
         alice = OlmDevice(
             "example",
@@ -451,11 +485,11 @@ class TestClass:
         finally:
             # remove the databases, the known devices store is handled by
             # monkeypatching
-            os.remove(os.path.join(
+            remove_database(os.path.join(
                 ephemeral_dir,
                 "{}_{}.db".format(AliceId, Alice_device)
             ))
-            os.remove(os.path.join(
+            remove_database(os.path.join(
                 ephemeral_dir,
                 "{}_{}.db".format(BobId, Bob_device)
             ))
@@ -528,11 +562,11 @@ class TestClass:
 
         assert len(sharing_with) == 1
 
-        os.remove(os.path.join(
+        remove_database(os.path.join(
             ephemeral_dir,
             "{}_{}.db".format(AliceId, Alice_device)
         ))
-        os.remove(os.path.join(
+        remove_database(os.path.join(
             ephemeral_dir,
             "{}_{}.db".format(BobId, Bob_device)
         ))
@@ -682,11 +716,11 @@ class TestClass:
         alice.verify_device(bob2_device)
         assert alice.user_fully_verified(BobId)
 
-        os.remove(os.path.join(
+        remove_database(os.path.join(
             ephemeral_dir,
             "{}_{}.db".format(AliceId, Alice_device)
         ))
-        os.remove(os.path.join(
+        remove_database(os.path.join(
             ephemeral_dir,
             "{}_{}.db".format(BobId, Bob_device)
         ))
@@ -827,11 +861,11 @@ class TestClass:
         assert not alice.get_missing_sessions([BobId])
         assert alice.session_store.get(bob_device.curve25519)
 
-        os.remove(os.path.join(
+        remove_database(os.path.join(
             ephemeral_dir,
             "{}_{}.db".format(AliceId, Alice_device)
         ))
-        os.remove(os.path.join(
+        remove_database(os.path.join(
             ephemeral_dir,
             "{}_{}.db".format(BobId, Bob_device)
         ))
@@ -1050,6 +1084,16 @@ class TestClass:
         olm_account.handle_response(response)
         assert device.display_name == "Phoney"
 
+    def test_users_for_key_claiming(self, olm_account):
+        device = faker.olm_device()
+
+        olm_account.wedged_devices.append(device)
+        olm_account.key_request_devices_no_session.append(device)
+
+        assert olm_account.get_users_for_key_claiming() == {
+            device.user_id: [device.device_id]
+        }
+
     def test_replay_attack_protection(self, olm_account, bob_account):
         alice = olm_account
         bob = bob_account
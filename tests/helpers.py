@@ -71,12 +71,23 @@ faker.add_provider(Provider)
 ephemeral_dir = os.path.join(os.curdir, "tests/data/encryption")
 
 
+def remove_database(path):
+    """Remove a sqlite database as well as its WAL and shared memory files."""
+    os.remove(path)
+
+    for suffix in ("-wal", "-shm"):
+        try:
+            os.remove(path + suffix)
+        except FileNotFoundError:
+            pass
+
+
 def ephemeral(func):
     def wrapper(*args, **kwargs):
         try:
             ret = func(*args, **kwargs)
         finally:
-            os.remove(os.path.join(
+            remove_database(os.path.join(
                 ephemeral_dir,
                 "@ephemeral:example.org_DEVICEID.db"
             ))
@@ -7,8 +7,9 @@ from collections import defaultdict
 from shutil import copyfile
 
 import pytest
+from peewee import OperationalError
 
-from helpers import ephemeral, ephemeral_dir, faker
+from helpers import ephemeral, ephemeral_dir, faker, remove_database
 from nio.crypto import (InboundGroupSession, OlmAccount, OlmDevice,
                         OutboundGroupSession, OutboundSession,
                         OutgoingKeyRequest, TrustState)
@@ -117,6 +118,8 @@ class TestClass:
         assert key.device_id == loaded_key.device_id
         assert key.key == loaded_key.key
         assert key == loaded_key
+        assert hash(key) == hash(loaded_key)
+        assert len({key, loaded_key}) == 1
 
     def test_key_store(self, tempdir):
         store_path = os.path.join(tempdir, "test_store")
@@ -142,6 +145,32 @@ class TestClass:
         with pytest.raises(OlmTrustError):
             store.add(fake_key)
 
+    def test_key_store_add_many_invalid(self, tempdir):
+        store_path = os.path.join(tempdir, "test_store")
+        store = KeyStore(store_path)
+
+        key = faker.ed25519_key()
+        store.add(key)
+
+        fake_key = copy.copy(key)
+        fake_key.key = "FAKE_KEY"
+
+        new_key = faker.ed25519_key()
+
+        with pytest.raises(OlmTrustError):
+            store.add_many([new_key, fake_key])
+
+        assert new_key not in store
+
+        other_key = faker.ed25519_key()
+        assert store.add(other_key)
+
+        store2 = KeyStore(store_path)
+
+        assert key in store2
+        assert other_key in store2
+        assert new_key not in store2
+
     def test_key_store_check_invalid(self, tempdir):
         store_path = os.path.join(tempdir, "test_store")
         store = KeyStore(os.path.join(tempdir, "test_store"))
@@ -173,6 +202,48 @@ class TestClass:
         for key in keys:
             assert key in store2
 
+    def test_key_store_append(self, tempdir):
+        store_path = os.path.join(tempdir, "test_store")
+        store = KeyStore(store_path)
+
+        keys = [faker.ed25519_key() for _ in range(3)]
+
+        for key in keys:
+            assert store.add(key)
+
+        assert not store.add(keys[0])
+
+        with open(store_path) as f:
+            assert f.read() == "".join(key.to_line() for key in keys)
+
+        mtime = os.stat(store_path).st_mtime_ns
+        assert not store.remove(faker.ed25519_key())
+        assert os.stat(store_path).st_mtime_ns == mtime
+
+        store.remove(keys[1])
+        store2 = KeyStore(store_path)
+
+        assert keys[0] in store2
+        assert keys[1] not in store2
+        assert keys[2] in store2
+
+    def test_key_store_append_missing_newline(self, tempdir):
+        store_path = os.path.join(tempdir, "test_store")
+
+        key = faker.ed25519_key()
+
+        with open(store_path, "w") as f:
+            f.write(key.to_line().rstrip("\n"))
+
+        store = KeyStore(store_path)
+        new_key = faker.ed25519_key()
+        assert store.add(new_key)
+
+        store2 = KeyStore(store_path)
+
+        assert key in store2
+        assert new_key in store2
+
     def test_key_store_remove_many(self, tempdir):
         store_path = os.path.join(tempdir, "test_store")
         store = KeyStore(os.path.join(tempdir, "test_store"))
@@ -200,6 +271,15 @@ class TestClass:
         account = store.load_account()
         assert not account
 
+    @ephemeral
+    def test_store_journal_mode(self):
+        store = self.ephemeral_store
+        journal_mode = store.database.execute_sql(
+            "PRAGMA journal_mode"
+        ).fetchone()[0]
+
+        assert journal_mode == "wal"
+
     @ephemeral
     def test_store_account_saving(self):
         account = self._create_ephemeral_account()
@@ -209,6 +289,60 @@ class TestClass:
 
         assert account.identity_keys == loaded_account.identity_keys
 
+    @ephemeral
+    def test_store_account_updating(self):
+        store = self.ephemeral_store
+        account = OlmAccount()
+        store.save_account(account)
+
+        account.generate_one_time_keys(10)
+        account.shared = True
+        store.save_account(account)
+        store.save_account(account)
+
+        loaded_account = self.ephemeral_store.load_account()
+
+        assert loaded_account.shared
+        assert account.one_time_keys == loaded_account.one_time_keys
+
+    def test_store_account_save_skipping(self, tempdir, monkeypatch):
+        store = MatrixStore("@ephemeral:example.org", "DEVICEID", tempdir)
+        account = OlmAccount()
+        store.save_account(account)
+
+        statements = []
+        execute_sql = store.database.execute_sql
+
+        def counting_execute_sql(sql, *args, **kwargs):
+            statements.append(sql)
+            return execute_sql(sql, *args, **kwargs)
+
+        monkeypatch.setattr(store.database, "execute_sql",
+                            counting_execute_sql)
+
+        store.save_account(account)
+        assert not statements
+
+        commit = store.database.commit
+
+        def failing_commit():
+            raise OperationalError("database is locked")
+
+        monkeypatch.setattr(store.database, "commit", failing_commit)
+        account.generate_one_time_keys(10)
+
+        with pytest.raises(OperationalError):
+            store.save_account(account)
+
+        monkeypatch.setattr(store.database, "commit", commit)
+        store.save_account(account)
+        assert statements
+
+        store2 = MatrixStore("@ephemeral:example.org", "DEVICEID", tempdir)
+        loaded_account = store2.load_account()
+
+        assert account.one_time_keys == loaded_account.one_time_keys
+
     @ephemeral
     def test_store_session(self):
         account = self._create_ephemeral_account()
@@ -225,6 +359,24 @@ class TestClass:
         assert loaded_session
         assert session.id == loaded_session.id
 
+    @ephemeral
+    def test_store_many_sessions(self):
+        account = self._create_ephemeral_account()
+        store = self.ephemeral_store
+
+        sessions = [
+            (BOB_CURVE, OutboundSession(account, BOB_CURVE, BOB_ONETIME))
+            for _ in range(150)
+        ]
+        store.save_sessions(sessions)
+
+        store2 = self.ephemeral_store
+        session_store = store2.load_sessions()
+
+        assert len(session_store[BOB_CURVE]) == 150
+        assert ({s.id for _, s in sessions}
+                == {s.id for s in session_store[BOB_CURVE]})
+
     @ephemeral
     def test_store_group_session(self):
         account = self._create_ephemeral_account()
@@ -291,7 +443,7 @@ class TestClass:
             assert account.identity_keys == loaded_account.identity_keys
 
         finally:
-            os.remove(os.path.join(
+            remove_database(os.path.join(
                 ephemeral_dir,
                 "ephemeral2_DEVICEID2.db"
             ))
@@ -319,6 +471,32 @@ class TestClass:
         assert loaded_session
         assert session.id == loaded_session.id
 
+    @ephemeral
+    def test_saving_sessions_twice(self):
+        account = self._create_ephemeral_account()
+        store = self.ephemeral_store
+
+        session = OutboundSession(account, BOB_CURVE, BOB_ONETIME)
+        in_group = InboundGroupSession(
+            OutboundGroupSession().session_key,
+            account.identity_keys["ed25519"],
+            account.identity_keys["curve25519"],
+            TEST_ROOM,
+            TEST_FORWARDING_CHAIN
+        )
+
+        for _ in range(3):
+            store.save_session(BOB_CURVE, session)
+            store.save_inbound_group_session(in_group)
+
+        store2 = self.ephemeral_store
+        group_sessions = list(store2.load_inbound_group_sessions())
+
+        assert len(store2.load_sessions()[BOB_CURVE]) == 1
+        assert len(group_sessions) == 1
+        assert (sorted(group_sessions[0].forwarding_chain) ==
+                sorted(TEST_FORWARDING_CHAIN))
+
     @ephemeral
     def test_encrypted_room_saving(self):
         self._create_ephemeral_account()
@@ -655,6 +833,38 @@ class TestClass:
         for device in device_list:
             assert sqlstore.is_device_ignored(device)
 
+    def test_verifying_many(self, store):
+        devices = self.example_devices
+
+        device_list = [
+            device for d in devices.values() for device in d.values()
+        ]
+
+        store.save_device_keys(devices)
+        store.ignore_devices(device_list)
+        store.verify_devices(device_list)
+
+        for device in device_list:
+            assert store.is_device_verified(device)
+            assert not store.is_device_ignored(device)
+            assert device.trust_state == TrustState.verified
+
+    def test_verifying_many_sqlite(self, sqlstore):
+        devices = self.example_devices
+
+        device_list = [
+            device for d in devices.values() for device in d.values()
+        ]
+
+        sqlstore.save_device_keys(devices)
+        sqlstore.ignore_devices(device_list)
+        sqlstore.verify_devices(device_list)
+
+        for device in device_list:
+            assert sqlstore.is_device_verified(device)
+            assert not sqlstore.is_device_ignored(device)
+            assert device.trust_state == TrustState.verified
+
     def test_trust_state_updating_sqlite(self, sqlstore):
         devices = self.example_devices
         bob_device = devices[BOB_ID][BOB_DEVICE]